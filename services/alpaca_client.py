@@ -1,42 +1,425 @@
+import atexit
+import hashlib
 import os
-from typing import Any, Dict, Optional
+import socket
+import threading
+import time
+import uuid
+from typing import Any, Callable, ClassVar, Dict, Final, List, Optional, Tuple, Union
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
 
 from utils.env_loader import load_env_from_known_locations
+from utils import fast_json
+
+__all__ = ["AlpacaClient"]
+
+_CLIENT_ORDER_ID_PREFIX: Final = b'{"client_order_id":'
+# Recently submitted orders remembered for duplicate suppression
+_IDEMPOTENCY_MAX_ENTRIES: Final = 1024
+
+
+_creds: Optional[Tuple[str, str]] = None
+
+
+def _load_creds() -> Tuple[Optional[str], Optional[str]]:
+    # The .env walk and env reads happen once per process once both keys are found;
+    # a miss is not remembered, so keys set later are still picked up
+    global _creds
+    if _creds is not None:
+        return _creds
+    load_env_from_known_locations()
+    key, secret = os.getenv("ALPACA_API_KEY"), os.getenv("ALPACA_SECRET_KEY")
+    if key and secret:
+        _creds = (key, secret)
+    return key, secret
+
+
+def _with_client_order_id(body: bytes, client_order_id: str) -> bytes:
+    """Prepend a client_order_id member to an encoded (non-empty) JSON order object."""
+    return _CLIENT_ORDER_ID_PREFIX + fast_json.dumps(client_order_id) + b"," + body[1:]
+
+
+def _low_latency_socket_options() -> List[Tuple[int, int, int]]:
+    # Nagle must stay off so small order bodies go out immediately, and idle pooled
+    # connections should survive the gaps between trading decisions.
+    # Keepalive timing knobs are not exposed on every platform.
+    opts = list(HTTPConnection.default_socket_options)
+    nodelay = (socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    if nodelay not in opts:
+        opts.append(nodelay)
+    opts.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+    if hasattr(socket, "TCP_KEEPIDLE"):
+        opts.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 30))
+    if hasattr(socket, "TCP_KEEPINTVL"):
+        opts.append((socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, 10))
+    return opts
+
+
+class LowLatencyAdapter(HTTPAdapter):
+    """HTTPAdapter whose pooled sockets use TCP_NODELAY and TCP keepalive."""
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        kwargs["socket_options"] = _low_latency_socket_options()
+        super().init_poolmanager(*args, **kwargs)
+
+
+def _build_session(api_key: str, secret_key: str) -> requests.Session:
+    session = requests.Session()
+    # Pool sized for concurrent fan-out (the default keeps 10 and discards the rest).
+    # Transient failures are retried with backoff for idempotent verbs only; order POSTs are never replayed.
+    adapter = LowLatencyAdapter(
+        pool_connections=32,
+        pool_maxsize=32,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.2,
+            status_forcelist=(429, 502, 503, 504),
+            allowed_methods=frozenset(["GET", "DELETE"]),
+            raise_on_status=False,
+        ),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "APCA-API-KEY-ID": api_key,
+        "APCA-API-SECRET-KEY": secret_key,
+        "Content-Type": "application/json"
+    })
+    return session
 
 
 class AlpacaClient:
-    def __init__(self, api_key: Optional[str] = None, secret_key: Optional[str] = None, paper: bool = True):
-        load_env_from_known_locations()
-        self.api_key = api_key or os.getenv("ALPACA_API_KEY")
-        self.secret_key = secret_key or os.getenv("ALPACA_SECRET_KEY")
+    # One warm connection pool per (endpoint, key id, secret digest) shared by every client instance.
+    # The secret is part of the key because the session carries it in its auth headers.
+    _sessions: ClassVar[Dict[Tuple[str, str, str], requests.Session]] = {}
+    _sessions_lock: ClassVar[threading.Lock] = threading.Lock()
+    # Worker pool behind submit_order_async, shared by every client and started on first use
+    _executor: ClassVar[Optional[ThreadPoolExecutor]] = None
+
+    @classmethod
+    def _get_session(cls, base: str, api_key: str, secret_key: str) -> requests.Session:
+        key = (base, api_key, hashlib.sha256(secret_key.encode()).hexdigest())
+        with cls._sessions_lock:
+            session = cls._sessions.get(key)
+            if session is None:
+                session = _build_session(api_key, secret_key)
+                cls._sessions[key] = session
+            return session
+
+    @classmethod
+    def _get_executor(cls) -> ThreadPoolExecutor:
+        with cls._sessions_lock:
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="alpaca-submit")
+            return cls._executor
+
+    @classmethod
+    def close_sessions(cls) -> None:
+        """Close every shared session and the async-submit pool (registered to run at interpreter exit)."""
+        with cls._sessions_lock:
+            executor, cls._executor = cls._executor, None
+        if executor is not None:
+            # Let already-queued orders finish while their sessions are still open
+            executor.shutdown(wait=True)
+        with cls._sessions_lock:
+            for session in cls._sessions.values():
+                session.close()
+            cls._sessions.clear()
+
+    def __init__(self, api_key: Optional[str] = None, secret_key: Optional[str] = None, paper: bool = True,
+                 idempotency_window_s: float = 0.0) -> None:
+        env_key, env_secret = _load_creds()
+        self.api_key = api_key or env_key
+        self.secret_key = secret_key or env_secret
         self.paper = paper
         if not self.api_key or not self.secret_key:
             raise RuntimeError("Alpaca credentials not set in env")
         self.base = "https://paper-api.alpaca.markets" if paper else "https://api.alpaca.markets"
-        self.session = requests.Session()
-        self.session.headers.update({
-            "APCA-API-KEY-ID": self.api_key,
-            "APCA-API-SECRET-KEY": self.secret_key,
-            "Content-Type": "application/json"
-        })
+        # Static endpoints built once instead of formatted on every call
+        self._url_account = f"{self.base}/v2/account"
+        self._url_orders = f"{self.base}/v2/orders"
+        self._url_positions = f"{self.base}/v2/positions"
+        self.session = self._get_session(self.base, self.api_key, self.secret_key)
+        # Short-lived read cache: key -> (monotonic fetch time, response).
+        # _cache_gen is bumped by invalidate() so a read that overlapped a mutation is not stored.
+        self._cache: Dict[str, Tuple[float, Any]] = {}
+        self._cache_gen = 0
+        self._cache_lock = threading.Lock()
+        # Per-thread receive buffer reused by the large list endpoints (orders, positions)
+        self._recv = threading.local()
+        # Opt-in duplicate-submission guard:
+        # idempotency key -> (monotonic first-attempt time, client_order_id, Alpaca response or None).
+        # Off by default: two identical orders are two orders unless the caller asks otherwise.
+        self.idempotency_window_s = idempotency_window_s
+        self._idem: "OrderedDict[str, Tuple[float, str, Optional[Dict[str, Any]]]]" = OrderedDict()
+        self._idem_lock = threading.Lock()
+
+    def _cached_get(self, key: str, ttl: float, fetch: Callable[[], Any]) -> Any:
+        """Serve a read from the short-lived cache, fetching on a miss.
+
+        Cached lists/dicts are shared between callers, so callers must not mutate them.
+        """
+        now = time.monotonic()
+        hit = self._cache.get(key)
+        if hit is not None and now - hit[0] < ttl:
+            return hit[1]
+        gen = self._cache_gen
+        res = fetch()
+        with self._cache_lock:
+            # An invalidate() during the fetch means res may predate a mutation; return it uncached
+            if self._cache_gen == gen:
+                self._cache[key] = (now, res)
+        return res
+
+    def invalidate(self, prefix: str = "") -> None:
+        """Drop cached reads whose key starts with prefix (all of them by default)."""
+        with self._cache_lock:
+            self._cache_gen += 1
+            for key in [k for k in self._cache if k.startswith(prefix)]:
+                del self._cache[key]
+
+    def _request(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        body: Union[bytes, Dict[str, Any], None] = None,
+    ) -> Any:
+        """Single dispatch point for every Alpaca REST call; returns parsed JSON (None for empty bodies)."""
+        data = body if body is None or isinstance(body, bytes) else fast_json.dumps(body)
+        try:
+            resp = self.session.request(method, url, params=params, data=data, timeout=30)
+            resp.raise_for_status()
+            return fast_json.loads(resp.content) if resp.content else None
+        finally:
+            if method != "GET":
+                # Any mutation attempt may change buying power, orders and positions
+                self.invalidate()
+
+    def _get_streamed(self, url: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """GET a potentially large JSON array, reading it into a reused per-thread buffer.
+
+        The buffer keeps its high-water size, so steady-state polling of orders/positions
+        does no per-call body allocation; the parser reads the bytes in place.
+        """
+        buf: Optional[bytearray] = getattr(self._recv, "buf", None)
+        if buf is None:
+            buf = self._recv.buf = bytearray(1 << 16)
+        n = 0
+        with self.session.get(url, params=params, timeout=30, stream=True) as resp:
+            resp.raise_for_status()
+            for chunk in resp.raw.stream(65536, decode_content=True):
+                buf[n:n + len(chunk)] = chunk
+                n += len(chunk)
+        if n == 0:
+            return None
+        view = memoryview(buf)[:n]
+        try:
+            return fast_json.loads(view)
+        finally:
+            view.release()
 
     def get_account(self) -> Dict[str, Any]:
-        resp = self.session.get(f"{self.base}/v2/account", timeout=30)
-        resp.raise_for_status()
-        return resp.json()
+        # Account state moves on second timescales; repeated reads within 1s are served from memory
+        return self._cached_get("account", 1.0, lambda: self._request("GET", self._url_account))
 
-    def place_order(self, symbol: str, qty: int, side: str, type_: str = "market", time_in_force: str = "day", paper_guard: bool = True) -> Dict[str, Any]:
-        if paper_guard and not self.paper:
-            raise RuntimeError("Safety: live trading blocked without explicit opt-in")
-        order = {
+    def get_positions(self) -> List[Dict[str, Any]]:
+        return self._cached_get("positions", 0.5, lambda: self._get_streamed(self._url_positions))
+
+    def get_position(self, symbol: str) -> Dict[str, Any]:
+        return self._request("GET", self._url_positions + "/" + symbol)
+
+    def get_orders(self, status: str = "open", limit: int = 50) -> List[Dict[str, Any]]:
+        return self._cached_get(
+            f"orders:{status}:{limit}", 0.5,
+            lambda: self._get_streamed(self._url_orders, params={"status": status, "limit": limit}),
+        )
+
+    def get_order(self, order_id: str) -> Dict[str, Any]:
+        return self._request("GET", self._url_orders + "/" + order_id)
+
+    def _idem_reserve(self, key: str, client_order_id: str) -> Tuple[Optional[Dict[str, Any]], str]:
+        """Return (earlier response or None, client_order_id to send) for an order key.
+
+        Within the window the first attempt's client_order_id is reserved before its POST,
+        so a retry after a timeout resends the same id and Alpaca rejects it as a duplicate
+        rather than filling twice.
+        """
+        if self.idempotency_window_s <= 0:
+            return None, client_order_id
+        now = time.monotonic()
+        with self._idem_lock:
+            hit = self._idem.get(key)
+            if hit is not None and now - hit[0] < self.idempotency_window_s:
+                self._idem.move_to_end(key)
+                return hit[2], hit[1]
+            self._idem[key] = (now, client_order_id, None)
+            self._idem.move_to_end(key)
+            while len(self._idem) > _IDEMPOTENCY_MAX_ENTRIES:
+                self._idem.popitem(last=False)
+            return None, client_order_id
+
+    def _idem_store(self, key: str, client_order_id: str, resp: Dict[str, Any]) -> None:
+        if self.idempotency_window_s <= 0:
+            return
+        with self._idem_lock:
+            hit = self._idem.get(key)
+            self._idem[key] = (hit[0] if hit is not None else time.monotonic(), client_order_id, resp)
+
+    def _idem_forget_order(self, order_id: str) -> None:
+        with self._idem_lock:
+            for key in [k for k, (_, _, resp) in self._idem.items() if resp is not None and resp.get("id") == order_id]:
+                del self._idem[key]
+
+    def _submit(self, order: Dict[str, Any]) -> Dict[str, Any]:
+        """POST an order, stamping a client_order_id when the caller did not supply one.
+
+        With idempotency_window_s > 0, a resubmission inside the window returns the original
+        response instead of placing a second order. Suppression is in-process and best-effort.
+        """
+        body = fast_json.dumps(order, sort_keys=True)
+        given = order.get("client_order_id")
+        # Key on the order content before stamping an id, so a retry maps to the same entry
+        key = given or hashlib.blake2b(body, digest_size=16).hexdigest()
+        cached, client_order_id = self._idem_reserve(key, given or uuid.uuid4().hex)
+        if cached is not None:
+            return cached
+        if not given:
+            body = _with_client_order_id(body, client_order_id)
+        resp = self._request("POST", self._url_orders, body=body)
+        self._idem_store(key, client_order_id, resp)
+        return resp
+
+    @staticmethod
+    def _build_order(
+        symbol: str,
+        qty: int,
+        side: str,
+        type_: str,
+        time_in_force: str,
+        limit_price: Optional[float],
+        stop_price: Optional[float],
+        client_order_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        order: Dict[str, Any] = {
             "symbol": symbol,
             "qty": qty,
             "side": side,
             "type": type_,
             "time_in_force": time_in_force
         }
-        resp = self.session.post(f"{self.base}/v2/orders", json=order, timeout=30)
-        resp.raise_for_status()
-        return resp.json()
+        if limit_price is not None:
+            order["limit_price"] = limit_price
+        if stop_price is not None:
+            order["stop_price"] = stop_price
+        if client_order_id:
+            order["client_order_id"] = client_order_id
+        return order
+
+    def submit_order(
+        self,
+        symbol: str,
+        qty: int,
+        side: str,
+        type_: str = "market",
+        time_in_force: str = "day",
+        limit_price: Optional[float] = None,
+        stop_price: Optional[float] = None,
+        client_order_id: Optional[str] = None,
+        paper_guard: bool = True,
+    ) -> Dict[str, Any]:
+        """Submit an order and return Alpaca's order object.
+
+        Every order carries a client_order_id (a uuid4 hex unless one is given), so the
+        returned order can be correlated later without polling get_order. Pass your own
+        client_order_id (or set idempotency_window_s) to make retries safe.
+        """
+        if paper_guard and not self.paper:
+            raise RuntimeError("Safety: live trading blocked without explicit opt-in")
+        order = self._build_order(symbol, qty, side, type_, time_in_force, limit_price, stop_price, client_order_id)
+        return self._submit(order)
+
+    def submit_order_async(
+        self,
+        symbol: str,
+        qty: int,
+        side: str,
+        type_: str = "market",
+        time_in_force: str = "day",
+        limit_price: Optional[float] = None,
+        stop_price: Optional[float] = None,
+        client_order_id: Optional[str] = None,
+        paper_guard: bool = True,
+    ) -> "Future[Dict[str, Any]]":
+        """Queue an order and return a Future for Alpaca's response.
+
+        Orders run on a worker pool shared by all clients, so a burst of N submissions
+        is sent concurrently and costs roughly one round-trip instead of N.
+        """
+        if paper_guard and not self.paper:
+            raise RuntimeError("Safety: live trading blocked without explicit opt-in")
+        order = self._build_order(symbol, qty, side, type_, time_in_force, limit_price, stop_price, client_order_id)
+        return self._get_executor().submit(self._submit, order)
+
+    def place_order(self, symbol: str, qty: int, side: str, type_: str = "market", time_in_force: str = "day", paper_guard: bool = True) -> Dict[str, Any]:
+        return self.submit_order(symbol, qty, side, type_=type_, time_in_force=time_in_force, paper_guard=paper_guard)
+
+    def _delete(self, url: str) -> bool:
+        """DELETE without raising on HTTP errors; True for a 2xx response.
+
+        Transient failures are already retried by the session's urllib3 Retry, so only
+        socket-layer errors that survive it are caught here.
+        """
+        try:
+            resp = self.session.delete(url, timeout=30)
+        except (requests.ConnectionError, requests.Timeout):
+            return False
+        finally:
+            self.invalidate()
+        return 200 <= resp.status_code < 300
+
+    def cancel_order(self, order_id: str) -> bool:
+        ok = self._delete(self._url_orders + "/" + order_id)
+        if ok:
+            self._idem_forget_order(order_id)
+        return ok
+
+    def cancel_all_orders(self) -> bool:
+        ok = self._delete(self._url_orders)
+        if ok:
+            with self._idem_lock:
+                self._idem.clear()
+        return ok
+
+    def submit_orders_bulk(self, orders: List[Dict[str, Any]], max_in_flight: int = 8, paper_guard: bool = True) -> List[Dict[str, Any]]:
+        """Submit several order payloads concurrently over the shared session.
+
+        Alpaca has no batch endpoint, so orders are POSTed in parallel (at most
+        max_in_flight at once). Returns one entry per input order, in input order:
+        {"id": <order id or None>, "success": bool, "response_or_error": <order dict or error str>}.
+        A failed order does not affect the others.
+        """
+        if paper_guard and not self.paper:
+            raise RuntimeError("Safety: live trading blocked without explicit opt-in")
+        if not orders:
+            return []
+        results: List[Dict[str, Any]] = [{} for _ in orders]
+        # Keep max_in_flight within the adapter pool (32) so connections are reused, not discarded
+        with ThreadPoolExecutor(max_workers=min(max(1, max_in_flight), len(orders))) as ex:
+            futs = {ex.submit(self._submit, o): i for i, o in enumerate(orders)}
+            for fut in as_completed(futs):
+                idx = futs[fut]
+                try:
+                    resp = fut.result()
+                    results[idx] = {"id": resp.get("id"), "success": True, "response_or_error": resp}
+                except Exception as exc:
+                    results[idx] = {"id": None, "success": False, "response_or_error": str(exc)}
+        return results
+
 
+atexit.register(AlpacaClient.close_sessions)
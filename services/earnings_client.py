@@ -1,10 +1,41 @@
+import logging
 import os
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
 from services.http import HttpClient
 from utils.env_loader import load_env_from_known_locations
 
+logger = logging.getLogger(__name__)
+
+# Keeps the ticker.any_of query string well under Polygon's URL length limit
+_TICKERS_PER_QUERY = 100
+# Results per page; further pages are followed through next_url
+_PAGE_LIMIT = 1000
+
+
+def _chunks(symbols: List[str], size: int) -> List[List[str]]:
+    return [symbols[i:i + size] for i in range(0, len(symbols), size)]
+
+
+def _build_session() -> requests.Session:
+    """Keep-alive pool sized for the chunk fan-out; transient 429/5xx retried in urllib3, honouring Retry-After."""
+    retry = Retry(
+        total=5,
+        backoff_factor=0.2,
+        status_forcelist=(429, 502, 503, 504),
+        allowed_methods=frozenset(["GET"]),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retry))
+    return session
+
 
 class EarningsClient:
     def __init__(self, api_key: Optional[str] = None, http: Optional[HttpClient] = None):
@@ -12,35 +43,47 @@ class EarningsClient:
         self.api_key = api_key or os.getenv("POLYGON_API_KEY")
         if not self.api_key:
             raise RuntimeError("POLYGON_API_KEY not set")
-        self.http = http or HttpClient()
+        # Raise on exhausted retries so an outage is logged rather than read as "no earnings"
+        self.http = http or HttpClient(max_retries=1, session=_build_session(), raise_on_exhausted=True)
         self.base = "https://api.polygon.io"
 
-    def _query_one(self, symbol: str, date_iso: str) -> bool:
-        # Polygon earnings reference endpoint; checks announcements on the given date
-        url = f"{self.base}/vX/reference/earnings"
-        params = {
-            "ticker": symbol,
+    def _query_chunk(self, symbols: List[str], date_iso: str) -> Set[str]:
+        # Polygon earnings reference endpoint; one paginated query covers the whole chunk
+        url: Optional[str] = f"{self.base}/vX/reference/earnings"
+        params: Dict[str, Any] = {
+            "ticker.any_of": ",".join(symbols),
             "announced_on.gte": date_iso,
             "announced_on.lte": date_iso,
-            "limit": 1,
-            "order": "asc",
+            "limit": _PAGE_LIMIT,
             "apiKey": self.api_key,
         }
-        data = self.http.get_json(url, params=params)
-        results = data.get("results") or data.get("earnings") or []
-        return bool(results)
+        found: Set[str] = set()
+        while url:
+            data = self.http.get_json(url, params=params)
+            for r in data.get("results") or data.get("earnings") or []:
+                ticker = r.get("ticker")
+                if ticker:
+                    found.add(ticker)
+            # next_url already carries the cursor and filters, but not the API key
+            url = data.get("next_url")
+            params = {"apiKey": self.api_key}
+        return found
 
     def tickers_with_earnings_on(self, symbols: List[str], date_iso: str, max_workers: int = 8) -> Dict[str, bool]:
         if not symbols:
             return {}
-        out: Dict[str, bool] = {}
-        with ThreadPoolExecutor(max_workers=max_workers) as ex:
-            futs = {ex.submit(self._query_one, s, date_iso): s for s in symbols}
+        out: Dict[str, bool] = {s: False for s in symbols}
+        chunks = _chunks(symbols, _TICKERS_PER_QUERY)
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks)))) as ex:
+            futs = {ex.submit(self._query_chunk, chunk, date_iso): ",".join(chunk[:3]) + ("..." if len(chunk) > 3 else "") for chunk in chunks}
             for fut in as_completed(futs):
-                sym = futs[fut]
                 try:
-                    out[sym] = bool(fut.result())
-                except Exception:
-                    out[sym] = False
+                    found = fut.result()
+                except Exception as exc:
+                    # Tickers in a failed chunk stay False; surface it rather than pass silently
+                    logger.warning("Earnings lookup failed for %s on %s: %s", futs[fut], date_iso, exc)
+                    continue
+                for sym in found:
+                    if sym in out:
+                        out[sym] = True
         return out
-
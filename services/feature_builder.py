@@ -1,9 +1,18 @@
 from dataclasses import dataclass
-from typing import List, Dict, Any
+from operator import itemgetter
+from typing import List, Dict, Any, Tuple
 import math
 
+import numpy as np
 
-@dataclass
+try:
+    from numba import njit  # type: ignore[import-not-found]
+except Exception:
+    # If numba is not installed, the NumPy reductions below are used instead.
+    njit = None
+
+
+@dataclass(slots=True, frozen=True)
 class SentimentData:
     overall_sentiment: float
     confidence_level: float
@@ -11,7 +20,7 @@ class SentimentData:
     news_volume: float
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class MarketData:
     price_momentum: float
     volatility: float
@@ -20,7 +29,7 @@ class MarketData:
     volume: float = 0.0
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class EnrichedData:
     sentiment_analysis: SentimentData
     market_data: MarketData
@@ -31,6 +40,94 @@ def _safe_div(n: float, d: float, default: float = 0.0) -> float:
     return n / d if d != 0 else default
 
 
+def _close(bar: Dict[str, Any]) -> float:
+    """Bar close, falling back to the open when the close is missing."""
+    raw = bar.get("c")
+    if raw is None:
+        raw = bar.get("o", 0.0)
+    return float(raw)
+
+
+def _field(bar: Dict[str, Any], key: str) -> float:
+    """Numeric bar field, counting a missing or null value as 0."""
+    raw = bar.get(key)
+    return 0.0 if raw is None else float(raw)
+
+
+def _range_volume_loop(h: np.ndarray, l: np.ndarray, c: np.ndarray, v: np.ndarray) -> Tuple[float, float]:
+    # Single pass over the columns; only worth running compiled, see _range_volume_kernel
+    sum_range = 0.0
+    count_range = 0
+    sum_vol = 0.0
+    for i in range(h.shape[0]):
+        if c[i] > 0:
+            sum_range += (h[i] - l[i]) / c[i]
+            count_range += 1
+        sum_vol += v[i]
+    avg_range = sum_range / count_range if count_range else 0.0
+    return avg_range, sum_vol / h.shape[0]
+
+
+def _range_volume_numpy(h: np.ndarray, l: np.ndarray, c: np.ndarray, v: np.ndarray) -> Tuple[float, float]:
+    mask = c > 0
+    count = int(mask.sum())
+    avg_range = float(((h[mask] - l[mask]) / c[mask]).sum() / count) if count else 0.0
+    return avg_range, float(v.mean())
+
+
+# No fastmath: it assumes no NaNs, and c[i] > 0 must treat NaN exactly like the NumPy mask
+_range_volume_kernel = njit(cache=True)(_range_volume_loop) if njit is not None else _range_volume_numpy
+
+
+# Below this many bars the per-bar loop is faster than building NumPy columns (~break-even)
+_VECTOR_MIN_BARS = 128
+
+# C-level column getters for the array fast path (a missing key raises KeyError -> fallback)
+_GET_H = itemgetter("h")
+_GET_L = itemgetter("l")
+_GET_C = itemgetter("c")
+_GET_V = itemgetter("v")
+
+
+def _range_volume_fold(results: List[Dict[str, Any]]) -> Tuple[float, float]:
+    # One pass over the bar dicts; close falls back to open, other missing/null fields count as 0
+    sum_range = 0.0
+    count_range = 0
+    sum_vol = 0.0
+    for bar in results:
+        p = _close(bar)
+        if p > 0:
+            sum_range += (_field(bar, "h") - _field(bar, "l")) / p
+            count_range += 1
+        sum_vol += _field(bar, "v")
+
+    avg_range = sum_range / count_range if count_range else 0.0
+    avg_volume = sum_vol / len(results) if results else 0.0
+    return avg_range, avg_volume
+
+
+def _range_volume_stats(results: List[Dict[str, Any]]) -> Tuple[float, float]:
+    """Return (avg range/price over bars with a positive price, avg volume) for aggs bars."""
+    n = len(results)
+    if n >= _VECTOR_MIN_BARS:
+        try:
+            # Every bar carries h/l/c/v, so columns fill straight into float64 arrays
+            h = np.fromiter(map(_GET_H, results), dtype=np.float64, count=n)
+            l = np.fromiter(map(_GET_L, results), dtype=np.float64, count=n)
+            c = np.fromiter(map(_GET_C, results), dtype=np.float64, count=n)
+            v = np.fromiter(map(_GET_V, results), dtype=np.float64, count=n)
+        except (KeyError, TypeError, ValueError):
+            pass
+        else:
+            # fromiter turns a null field into NaN; the fold applies the open fallback and zero defaults
+            if any(np.isnan(col).any() for col in (h, l, c, v)):
+                return _range_volume_fold(results)
+            avg_range, avg_volume = _range_volume_kernel(h, l, c, v)
+            return float(avg_range), float(avg_volume)
+    # Short series (the runner's 10 daily bars) and bars with missing fields
+    return _range_volume_fold(results)
+
+
 def build_enriched_from_aggs(aggs: Dict[str, Any]) -> EnrichedData:
     """Derive an EnrichedData snapshot from Polygon aggs response.
 
@@ -58,26 +155,14 @@ def build_enriched_from_aggs(aggs: Dict[str, Any]) -> EnrichedData:
     last = results[-1]
 
     # Close prices
-    c_first = float(first.get("c", first.get("o", 0.0)))
-    c_last = float(last.get("c", last.get("o", 0.0)))
+    c_first = _close(first)
+    c_last = _close(last)
 
     # Price momentum (relative change)
     price_momentum = _safe_div(c_last - c_first, c_first, 0.0)
 
     # Intraperiod volatility proxy: avg range / price
-    ranges = []
-    volumes = []
-    for bar in results:
-        h = float(bar.get("h", 0.0))
-        l = float(bar.get("l", 0.0))
-        p = float(bar.get("c", bar.get("o", 0.0)))
-        v = float(bar.get("v", 0.0))
-        if p > 0:
-            ranges.append(_safe_div(h - l, p, 0.0))
-        volumes.append(v)
-
-    avg_range = sum(ranges) / len(ranges) if ranges else 0.0
-    avg_volume = sum(volumes) / len(volumes) if volumes else 0.0
+    avg_range, avg_volume = _range_volume_stats(results)
 
     # Volatility scaled
     volatility = max(0.0, avg_range)
@@ -101,8 +186,7 @@ def build_enriched_from_aggs(aggs: Dict[str, Any]) -> EnrichedData:
     key_ok = all(k in first for k in ("o", "h", "l", "c", "v"))
     dq = max(0.5, min(1.0, 0.5 + 0.02 * len(results) + (0.1 if key_ok else 0.0)))
 
-    # Price/volume from last bar for completeness
-    last_price = float(last.get("c", last.get("o", 0.0)))
+    # Volume from last bar for completeness (its price is c_last)
     last_volume = float(last.get("v", 0.0))
 
     return EnrichedData(
@@ -116,9 +200,8 @@ def build_enriched_from_aggs(aggs: Dict[str, Any]) -> EnrichedData:
             price_momentum=price_momentum,
             volatility=volatility,
             volume_ratio=volume_ratio,
-            price=last_price,
+            price=c_last,
             volume=last_volume,
         ),
         data_quality_score=dq,
     )
-
@@ -1,66 +1,94 @@
+import random
 import time
-import json
 from typing import Any, Dict, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+
+from utils import fast_json
+
+# Connections kept alive per host; covers the thread-pool fan-out used by callers
+_POOL_MAXSIZE = 16
+# Upper bound on any single retry wait, including a server-sent Retry-After
+MAX_BACKOFF_S = 30.0
 
 
 class HttpError(Exception):
     pass
 
 
-class HttpClient:
-    def __init__(self, timeout_seconds: float = 15.0, max_retries: int = 3, backoff_base_seconds: float = 0.5) -> None:
-        self.timeout_seconds = timeout_seconds
-        self.max_retries = max_retries
-        self.backoff_base_seconds = backoff_base_seconds
+def _backoff_delay(base: float, attempt: int, retry_after: Optional[str] = None) -> float:
+    """Seconds to wait before retry attempt+1: Retry-After (delta-seconds) if sent, else full jitter."""
+    if retry_after:
+        try:
+            return min(max(0.0, float(retry_after)), MAX_BACKOFF_S)
+        except ValueError:
+            pass  # HTTP-date form; fall back to jitter
+    # Full jitter keeps concurrent clients from retrying in lockstep after a 429 burst
+    return random.uniform(0, min(base * (2 ** attempt), MAX_BACKOFF_S))
 
-    def get_json(self, url: str, headers: Optional[Dict[str, str]] = None, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        last_error: Optional[Exception] = None
-        for attempt in range(self.max_retries + 1):
-            try:
-                resp = requests.get(url, headers=headers, params=params, timeout=self.timeout_seconds)
-                if resp.status_code >= 500:
-                    raise HttpError(f"Server error {resp.status_code}: {resp.text}")
-                if resp.status_code >= 400:
-                    # Client errors: don't retry
-                    raise HttpError(f"Client error {resp.status_code}: {resp.text}")
-                return resp.json()  # type: ignore[return-value]
-            except Exception as exc:  # requests exceptions or HttpError
-                last_error = exc
-                if attempt == self.max_retries:
-                    break
-                sleep_seconds = self.backoff_base_seconds * (2 ** attempt)
-                time.sleep(sleep_seconds)
-        raise HttpError(str(last_error))
 
-import time
-from typing import Any, Dict, Optional
-import requests
+def _body_preview(resp: requests.Response, limit: int = 512) -> str:
+    """First limit bytes of the body for error messages, without decoding the rest."""
+    return resp.content[:limit].decode("utf-8", "replace")
+
+
+def _new_session() -> requests.Session:
+    """Keep-alive session; retries stay in get_json's own loop, so the adapter never retries."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=_POOL_MAXSIZE, max_retries=0)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
 
 
 class HttpClient:
-    def __init__(self, timeout: int = 30, max_retries: int = 3, backoff: float = 0.5):
+    def __init__(
+        self,
+        timeout: int = 30,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        session: Optional[requests.Session] = None,
+        raise_on_exhausted: bool = False,
+    ):
         self.timeout = timeout
         self.max_retries = max_retries
         self.backoff = backoff
+        # By default a 429/5xx that outlasts the retries yields {}; set to raise HttpError instead
+        self.raise_on_exhausted = raise_on_exhausted
+        # Callers may share one session across clients; only a session created here is closed here
+        self._owns_session = session is None
+        self._session = session if session is not None else _new_session()
+
+    def close(self) -> None:
+        if self._owns_session:
+            self._session.close()
+
+    def __enter__(self) -> "HttpClient":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
 
     def get_json(self, url: str, params: Optional[Dict[str, Any]] = None, headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
         last_exc: Optional[Exception] = None
         for attempt in range(self.max_retries):
             try:
-                resp = requests.get(url, params=params, headers=headers, timeout=self.timeout)
+                resp = self._session.get(url, params=params, headers=headers, timeout=self.timeout)
                 if resp.status_code == 200:
-                    return resp.json()
+                    return fast_json.loads(resp.content)
                 # Retry on 429/5xx
                 if resp.status_code in (429, 500, 502, 503, 504):
-                    time.sleep(self.backoff * (2 ** attempt))
+                    if self.raise_on_exhausted:
+                        last_exc = HttpError(f"Retryable status {resp.status_code} from {url}: {_body_preview(resp)}")
+                    if attempt + 1 < self.max_retries:
+                        time.sleep(_backoff_delay(self.backoff, attempt, resp.headers.get("Retry-After")))
                     continue
                 resp.raise_for_status()
             except Exception as exc:
                 last_exc = exc
-                time.sleep(self.backoff * (2 ** attempt))
+                if attempt + 1 < self.max_retries:
+                    time.sleep(_backoff_delay(self.backoff, attempt))
         if last_exc:
             raise last_exc
         return {}
-
@@ -1,4 +1,5 @@
 import os
+import uuid
 import pytest
 
 from services.alpaca_client import AlpacaClient
@@ -14,3 +15,51 @@ def test_alpaca_account_paper_mode():
     assert isinstance(acct, dict)
     assert "id" in acct and "status" in acct
 
+
+
+def _paper_client(**kwargs):
+    if not os.getenv("ALPACA_API_KEY") or not os.getenv("ALPACA_SECRET_KEY"):
+        pytest.skip("Alpaca creds not set; skipping Alpaca client test.")
+    return AlpacaClient(paper=True, **kwargs)
+
+
+def _resting_buy(client, **kwargs):
+    # A far-from-market limit order rests unfilled until cancelled
+    return client.submit_order("AAPL", 1, "buy", type_="limit", limit_price=1.0, **kwargs)
+
+
+@pytest.mark.integration
+def test_alpaca_order_carries_client_order_id():
+    client = _paper_client()
+    mine = f"it-{uuid.uuid4().hex}"
+    try:
+        generated = _resting_buy(client)
+        given = _resting_buy(client, client_order_id=mine)
+        assert len(generated["client_order_id"]) == 32
+        assert given["client_order_id"] == mine
+    finally:
+        client.cancel_all_orders()
+
+
+@pytest.mark.integration
+def test_alpaca_duplicate_within_window_is_suppressed_until_cancel():
+    client = _paper_client(idempotency_window_s=60.0)
+    try:
+        first = _resting_buy(client)
+        assert _resting_buy(client)["id"] == first["id"]
+        assert client.cancel_order(first["id"]) is True
+        assert _resting_buy(client)["id"] != first["id"]
+    finally:
+        client.cancel_all_orders()
+
+
+@pytest.mark.integration
+def test_alpaca_submit_order_async_resolves():
+    client = _paper_client()
+    try:
+        futs = [client.submit_order_async("AAPL", 1, "buy", type_="limit", limit_price=1.0) for _ in range(3)]
+        ids = {f.result(timeout=30)["id"] for f in futs}
+        assert len(ids) == 3
+    finally:
+        client.cancel_all_orders()
+        AlpacaClient.close_sessions()
@@ -0,0 +1,40 @@
+import pytest
+
+from services.alpaca_client import AlpacaClient
+
+
+def test_credentials_set_after_a_miss_are_picked_up(monkeypatch):
+    import services.alpaca_client as alpaca_client
+
+    monkeypatch.setattr(alpaca_client, "_creds", None)
+    monkeypatch.setattr(alpaca_client, "load_env_from_known_locations", lambda: None)
+    monkeypatch.delenv("ALPACA_API_KEY", raising=False)
+    monkeypatch.delenv("ALPACA_SECRET_KEY", raising=False)
+    AlpacaClient(api_key="k", secret_key="s")
+    with pytest.raises(RuntimeError):
+        AlpacaClient()
+    monkeypatch.setenv("ALPACA_API_KEY", "env-key")
+    monkeypatch.setenv("ALPACA_SECRET_KEY", "env-secret")
+    assert AlpacaClient().api_key == "env-key"
+
+
+def test_clients_with_different_secrets_do_not_share_auth_headers():
+    a = AlpacaClient(api_key="key-id", secret_key="secret-before-rotation")
+    b = AlpacaClient(api_key="key-id", secret_key="secret-after-rotation")
+    assert a.session is not b.session
+    assert a.session.headers["APCA-API-SECRET-KEY"] == "secret-before-rotation"
+    assert b.session.headers["APCA-API-SECRET-KEY"] == "secret-after-rotation"
+    assert AlpacaClient(api_key="key-id", secret_key="secret-after-rotation").session is b.session
+
+
+def test_read_overlapping_an_invalidate_is_not_cached():
+    client = AlpacaClient(api_key="key-id", secret_key="secret")
+    first, second = object(), object()
+
+    def fetch_during_mutation():
+        client.invalidate()
+        return first
+
+    assert client._cached_get("orders", 60.0, fetch_during_mutation) is first
+    assert client._cached_get("orders", 60.0, lambda: second) is second
+    assert client._cached_get("orders", 60.0, lambda: first) is second
@@ -0,0 +1,10 @@
+import json
+
+from services.alpaca_client import AlpacaClient, _with_client_order_id
+from utils import fast_json
+
+
+def test_client_order_id_is_spliced_into_encoded_order():
+    order = AlpacaClient._build_order("AAPL", 3, "buy", "limit", "day", 101.5, None)
+    body = _with_client_order_id(fast_json.dumps(order, sort_keys=True), "abc123")
+    assert json.loads(body) == {**order, "client_order_id": "abc123"}
@@ -0,0 +1,30 @@
+import os
+import pytest
+
+import services.earnings_client as earnings_client
+from services.earnings_client import EarningsClient
+
+
+pytestmark = pytest.mark.integration
+
+
+def _have_polygon_key() -> bool:
+    return bool(os.getenv("POLYGON_API_KEY"))
+
+
+@pytest.mark.skipif(not _have_polygon_key(), reason="POLYGON_API_KEY not set; see polygon/.env or project .env")
+def test_chunked_paginated_lookup_matches_single_query(monkeypatch):
+    # A busy reporting day, so several of these symbols have an announcement on it
+    symbols = ["MSFT", "META", "QCOM", "ARM", "KLAC", "HOOD", "AAPL", "NVDA"]
+    date_iso = "2025-07-30"
+    client = EarningsClient()
+    single = client.tickers_with_earnings_on(symbols, date_iso)
+
+    # Force several chunks and one result per page so next_url is followed
+    monkeypatch.setattr(earnings_client, "_TICKERS_PER_QUERY", 3)
+    monkeypatch.setattr(earnings_client, "_PAGE_LIMIT", 1)
+    chunked = client.tickers_with_earnings_on(symbols, date_iso)
+
+    assert set(chunked) == set(symbols)
+    assert all(isinstance(v, bool) for v in chunked.values())
+    assert chunked == single
@@ -0,0 +1,9 @@
+from services.earnings_client import _chunks
+
+
+def test_chunks_cover_every_symbol_in_order():
+    symbols = [f"S{i}" for i in range(250)]
+    chunks = _chunks(symbols, 100)
+    assert [len(c) for c in chunks] == [100, 100, 50]
+    assert [s for c in chunks for s in c] == symbols
+    assert _chunks([], 100) == []
@@ -0,0 +1,31 @@
+import json
+from decimal import Decimal
+
+from utils import fast_json
+
+
+def test_dumps_is_compact_utf8_json():
+    payload = {"symbol": "AAPL", "qty": 1, "side": "buy", "note": "café"}
+    out = fast_json.dumps(payload)
+    assert out == '{"symbol":"AAPL","qty":1,"side":"buy","note":"café"}'.encode("utf-8")
+    assert json.loads(out) == payload
+
+
+def test_dumps_sort_keys_gives_canonical_bytes():
+    a = fast_json.dumps({"side": "buy", "qty": 2, "symbol": "MSFT"}, sort_keys=True)
+    b = fast_json.dumps({"symbol": "MSFT", "qty": 2, "side": "buy"}, sort_keys=True)
+    assert a == b == b'{"qty":2,"side":"buy","symbol":"MSFT"}'
+
+
+def test_dumps_encodes_decimal_as_exact_string():
+    out = fast_json.dumps({"qty": Decimal("10"), "limit_price": Decimal("101.2500")}, sort_keys=True)
+    assert out == b'{"limit_price":"101.2500","qty":"10"}'
+
+
+def test_loads_accepts_bytes_bytearray_memoryview_and_str():
+    raw = b'{"results":[{"c":1.5,"v":100}]}'
+    expected = {"results": [{"c": 1.5, "v": 100}]}
+    assert fast_json.loads(raw) == expected
+    assert fast_json.loads(bytearray(raw)) == expected
+    assert fast_json.loads(memoryview(raw)) == expected
+    assert fast_json.loads(raw.decode("utf-8")) == expected
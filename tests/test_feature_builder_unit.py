@@ -0,0 +1,54 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from services import feature_builder as fb
+
+
+def _bars(n, seed=7):
+    rng = random.Random(seed)
+    return [
+        {"o": 100 + rng.random(), "h": 101 + rng.random(), "l": 99 + rng.random(),
+         "c": 100 + rng.random(), "v": rng.randint(0, 10**6)}
+        for _ in range(n)
+    ]
+
+
+def test_vector_path_matches_per_bar_fold():
+    bars = _bars(fb._VECTOR_MIN_BARS * 3)
+    bars[5]["c"] = 0.0
+    bars[9]["c"] = -1.0
+    assert fb._range_volume_stats(bars) == pytest.approx(fb._range_volume_fold(bars), rel=1e-12)
+
+
+@pytest.mark.parametrize("damage", ["missing_h", "missing_c", "c_none", "h_none", "v_none"])
+def test_irregular_bars_take_the_fold_and_fall_back_to_open(damage):
+    bars = _bars(fb._VECTOR_MIN_BARS * 2)
+    if damage == "missing_h":
+        del bars[3]["h"]
+    elif damage == "missing_c":
+        del bars[3]["c"]
+    else:
+        bars[3][damage[0]] = None
+    expected = fb._range_volume_fold(bars)
+    assert fb._range_volume_stats(bars) == expected
+    assert not any(math.isnan(x) for x in expected)
+    if damage in ("missing_c", "c_none"):
+        bars[3]["c"] = bars[3]["o"]
+        assert expected == pytest.approx(fb._range_volume_fold(bars), rel=1e-12)
+
+
+def test_short_series_uses_fold():
+    bars = _bars(10)
+    assert fb._range_volume_stats(bars) == fb._range_volume_fold(bars)
+    assert fb._range_volume_stats([]) == (0.0, 0.0)
+
+
+def test_kernel_loop_matches_numpy_reduction():
+    rng = np.random.default_rng(3)
+    h, l, c, v = (rng.random(300) * 100 for _ in range(4))
+    c[[4, 8]] = [0.0, -2.0]
+    c[12] = np.nan
+    assert fb._range_volume_loop(h, l, c, v) == pytest.approx(fb._range_volume_numpy(h, l, c, v), rel=1e-12)
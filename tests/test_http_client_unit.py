@@ -0,0 +1,29 @@
+import requests
+
+from services.http import MAX_BACKOFF_S, _backoff_delay, _body_preview
+
+
+def test_numeric_retry_after_is_honoured_and_capped():
+    assert _backoff_delay(0.5, 0, "2") == 2.0
+    assert _backoff_delay(0.5, 0, "-3") == 0.0
+    assert _backoff_delay(0.5, 0, "3600") == MAX_BACKOFF_S
+
+
+def test_http_date_retry_after_falls_back_to_jitter():
+    for attempt in range(4):
+        assert 0.0 <= _backoff_delay(0.5, attempt, "Wed, 21 Oct 2015 07:28:00 GMT") <= 0.5 * 2 ** attempt
+
+
+def test_jitter_never_exceeds_the_cap():
+    assert all(0.0 <= _backoff_delay(0.5, attempt) <= MAX_BACKOFF_S for attempt in range(20))
+
+
+def _response(body):
+    resp = requests.Response()
+    resp._content = body
+    return resp
+
+
+def test_body_preview_truncates_and_replaces_invalid_utf8():
+    assert _body_preview(_response(b"x" * 2000)) == "x" * 512
+    assert _body_preview(_response(b"ok\xff"), limit=3) == "ok�"
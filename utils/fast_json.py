@@ -0,0 +1,35 @@
+from decimal import Decimal
+from typing import Any, Union
+import json
+
+try:
+    import orjson
+except Exception:
+    # If orjson is not installed, fall back to the stdlib codec (same output, slower).
+    orjson = None  # type: ignore[assignment]
+
+
+JsonInput = Union[bytes, bytearray, memoryview, str]
+
+
+def _default(obj: Any) -> Any:
+    # Decimals (prices/quantities) go out as exact strings, which Alpaca accepts for numeric fields
+    if isinstance(obj, Decimal):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any, sort_keys: bool = False) -> bytes:
+    """Serialize obj to compact UTF-8 JSON bytes (keys sorted when sort_keys, for canonical output)."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_SORT_KEYS if sort_keys else None)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, sort_keys=sort_keys, default=_default).encode("utf-8")
+
+
+def loads(data: JsonInput) -> Any:
+    """Parse JSON from bytes/str (e.g. a response's .content) without an intermediate str decode."""
+    if orjson is not None:
+        return orjson.loads(data)
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)